@@ -5,14 +5,25 @@ removed Quick Actions. Built on top of your v0.1 baseline.
 """
 
 import re
+import io
+import string
+import csv
 import json
+import orjson
 import requests
-from urllib.parse import quote_plus, urlparse
-from datetime import datetime
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote_plus, urlparse, urlunparse
+from datetime import datetime, timezone
 from dateutil import parser as dateparser
 
 import streamlit as st
-from bs4 import BeautifulSoup
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from bs4 import BeautifulSoup, SoupStrainer
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
 import plotly.express as px
@@ -23,7 +34,13 @@ import plotly.express as px
 st.set_page_config(page_title="Online Presence Monitor — v0.2", layout="wide")
 st.title("🔎 Online Presence Monitor — v0.2")
 
-analyzer = SentimentIntensityAnalyzer()
+# Streamlit reruns the script on every interaction; load the VADER lexicon once per process
+@st.cache_resource
+def get_analyzer():
+    return SentimentIntensityAnalyzer()
+
+analyzer = get_analyzer()
+VADER_LEXICON = analyzer.lexicon
 
 # ---------------------------
 # Secrets / Keys (single Google key)
@@ -43,80 +60,249 @@ if debug_mode:
 # ---------------------------
 MAX_RESULTS = 25
 MAX_REVIEWS_PER_SOURCE = 5
+FETCH_WORKERS = 16  # concurrent page fetches for CSE results
+MAX_FETCHES_PER_DOMAIN = 3
+MAX_RESPONSE_BYTES = 1_048_576  # read at most 1MB of any fetched page
+SITE_MAX_BYTES = 262_144  # CSE result pages: head + enough body text for MAX_TEXT_CHARS
+MAX_PARSE_CHARS = 500_000  # cap on page HTML handed to the parser
+MAX_TEXT_CHARS = 8000  # page text scanned for a rating
+MAX_SENTIMENT_CHARS = 500  # VADER cost is linear in tokens; compound saturates well before this
+
+# presence score weights (sites, rating, sentiment, recency, company)
+W_SITES, W_RATING, W_SENT, W_REC, W_COMP = 0.35, 0.30, 0.15, 0.10, 0.10
+# recency: <=7d -> 100, <=30d -> 80, <=90d -> 50, <=365d -> 30, older -> 10
+RECENCY_LIMITS_DAYS = [7, 30, 90, 365]
+RECENCY_SCORES = [100, 80, 50, 30, 10]
+# grade: >=90 A, >=80 B, >=70 C, >=60 D, else F
+GRADE_THRESHOLDS = [60, 70, 80, 90]
+GRADES = "FDCBA"
+
+# login walls / binary files: fetching these just burns the full timeout
+# base domains: subdomains (www., m., uk.linkedin.com...) match on the suffix
+SKIP_HOSTS = {"linkedin.com", "facebook.com", "twitter.com", "x.com"}
+SKIP_EXT = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".zip", ".mp4")
+
+HTML_MEDIA_TYPES = {"text/html", "application/xhtml+xml"}
+
+# only build the tags the site parse actually reads
+SITE_TEXT_TAGS = ("p", "span", "li", "blockquote")
+SITE_STRAINER = SoupStrainer(["title", "meta", *SITE_TEXT_TAGS])
 
 # ---------------------------
 # Helpers
 # ---------------------------
-def safe_get(url, headers=None, timeout=10):
-    headers = headers or {"User-Agent": "Mozilla/5.0 (compatible; PresenceMonitor/1.0)"}
+# one pooled session for every outbound call: keep-alive connections are
+# reused across results on the same host, the fetch threads and reruns
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; PresenceMonitor/1.0)"}
+
+@st.cache_resource
+def get_session():
+    session = requests.Session()
+    # retry connection errors only: a read timeout retried would double the worst-case wait
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=1, read=0, backoff_factor=0.3))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+SESSION = get_session()
+
+def is_fetchable(url):
+    if not url:
+        return False
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if any(host == d or host.endswith("." + d) for d in SKIP_HOSTS):
+        return False
+    return not parsed.path.lower().endswith(SKIP_EXT)
+
+def canonical_url(url):
+    """Collapse http/https, www., trailing slash and utm_* params so duplicates compare equal."""
+    p = urlparse(url)
+    host = p.netloc.lower().removeprefix("www.")
+    query = "&".join(kv for kv in p.query.split("&") if kv and not kv.startswith("utm_"))
+    return urlunparse(("https", host, p.path.rstrip("/"), "", query, ""))
+
+def make_soup(html, parse_only=None):
+    """lxml (C) parser on the capped page; html.parser if lxml can't handle the markup."""
+    html = html[:MAX_PARSE_CHARS]
+    try:
+        return BeautifulSoup(html, "lxml", parse_only=parse_only)
+    except Exception:
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+def safe_get(url, headers=None, timeout=10, max_bytes=MAX_RESPONSE_BYTES):
     try:
-        r = requests.get(url, headers=headers, timeout=timeout)
+        r = SESSION.get(url, headers=headers or DEFAULT_HEADERS, timeout=timeout, stream=True)
+        # headers are in but the body isn't: drop PDFs/images/etc. without downloading them
+        content_type = r.headers.get("Content-Type", "")
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type and media_type not in HTML_MEDIA_TYPES:
+            r.close()
+            if debug_mode:
+                st.write(f"[safe_get] Skipping non-HTML {content_type} at {url}")
+            return None
+        # read only the head of the body so huge pages can't blow memory/parse time
+        r._content = r.raw.read(max_bytes, decode_content=True)
+        r.close()
         return r
     except Exception as e:
         if debug_mode:
             st.write(f"[safe_get] Error fetching {url}: {e}")
         return None
 
-rating_regexes = [
-    re.compile(r'([0-5](?:\.\d)?)[/ ]? ?5'),
-    re.compile(r'([0-5](?:\.\d)?)\s*out\s*of\s*5', re.I),
-    re.compile(r'([0-5](?:\.\d)?)\s*stars?', re.I),
-    re.compile(r'(★★★★★|★★★★☆|★★★★|★★★☆|★★★|★★☆|★★|★☆|★)', re.UNICODE),
-]
+# one alternation = one scan of the text; the first match anywhere wins
+rating_regex = re.compile(
+    r'(?P<n1>[0-5](?:\.\d)?)[/ ]? ?5'
+    r'|(?P<n2>[0-5](?:\.\d)?)\s*out\s*of\s*5'
+    r'|(?P<n3>[0-5](?:\.\d)?)\s*stars?'
+    r'|(?P<stars>★★★★★|★★★★☆|★★★★|★★★☆|★★★|★★☆|★★|★☆|★)',
+    re.I | re.UNICODE,
+)
 star_map = {'★★★★★':5,'★★★★☆':4,'★★★★':4,'★★★☆':3,'★★★':3,'★★☆':2,'★★':2,'★☆':1,'★':1}
 
+# compiled once here rather than per fetch
+yelp_reviews_blob_regex = re.compile(r"(\{.*\"reviews\":\s*\[.*\]\s*\})", re.S)
+healthgrades_review_class_regex = re.compile("review|patient|comment")
+
 def extract_rating_from_text(text):
     if not text:
         return None
-    for rx in rating_regexes:
-        m = rx.search(text)
-        if m:
-            g = m.group(1)
-            if g in star_map:
-                return star_map[g]
-            try:
-                return float(g)
-            except:
-                continue
-    return None
+    m = rating_regex.search(text)
+    if not m:
+        return None
+    if m.group("stars"):
+        return star_map.get(m.group("stars"))
+    try:
+        return float(m.group("n1") or m.group("n2") or m.group("n3"))
+    except:
+        return None
 
-def sentiment_score(text):
-    if not text:
+@lru_cache(maxsize=2048)
+def _vader_compound(text):
+    # VADER only scores lexicon tokens: if none are present (and there are no
+    # emoji, which it expands to words) the compound is 0.0 without the full pass
+    if text.isascii() and not any(w in VADER_LEXICON or w.strip(string.punctuation) in VADER_LEXICON
+                                  for w in text.lower().split()):
         return 0.0
     return analyzer.polarity_scores(text)["compound"]
 
+def sentiment_score(text):
+    if not text or text.isspace():
+        return 0.0
+    return _vader_compound(text[:MAX_SENTIMENT_CHARS])
+
+def parse_date(value):
+    """Fast paths for the formats our sources emit; dateutil only for anything else.
+    Returns a naive UTC datetime so results compare against utcnow()."""
+    if value.endswith(" ago"):
+        # Google relative_time_description ("2 months ago") carries no usable date
+        raise ValueError(f"relative date: {value}")
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = datetime.strptime(value, "%m/%d/%Y")  # Yelp localizedDate
+        except ValueError:
+            dt = dateparser.parse(value)
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
 # ---------------------------
 # Google Custom Search (CSE)
 # ---------------------------
-@st.cache_data(ttl=600)
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
 def get_top_results(query, max_results=25):
     results = []
     if not API_KEY or not CSE_ID:
         if debug_mode:
             st.write("[get_top_results] Missing GOOGLE_API_KEY or GOOGLE_CSE_ID.")
         return results
-    try:
-        for start in range(1, max_results+1, 10):
-            url = f"https://www.googleapis.com/customsearch/v1?q={quote_plus(query)}&key={API_KEY}&cx={CSE_ID}&num={min(max_results,10)}&start={start}"
-            r = requests.get(url, timeout=10)
-            data = r.json()
-            for item in data.get("items", []):
-                results.append({
-                    "title": item.get("title"),
-                    "href": item.get("link"),
-                    "snippet": item.get("snippet")
-                })
-            if len(results) >= max_results:
+    urls = [f"https://www.googleapis.com/customsearch/v1?q={quote_plus(query)}&key={API_KEY}&cx={CSE_ID}&num={min(max_results,10)}&start={start}"
+            for start in range(1, max_results+1, 10)]
+    # pages are independent: fetch them concurrently, consume in rank order
+    with ThreadPoolExecutor(max_workers=len(urls) or 1) as ex:
+        futures = [ex.submit(SESSION.get, url, timeout=10) for url in urls]
+    for fut in futures:
+        try:
+            data = orjson.loads(fut.result().content)
+        except Exception as e:
+            if debug_mode:
+                st.write(f"[get_top_results] error: {e}")
+            continue
+        for item in data.get("items", []):
+            results.append({
+                "title": item.get("title"),
+                "href": item.get("link"),
+                "snippet": item.get("snippet")
+            })
+    return results[:max_results]
+
+# ---------------------------
+# CSE result page parse (light fetch for rating/snippet)
+# ---------------------------
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
+def fetch_page(url):
+    """Fetch + parse one page, keyed on the URL alone. Returns title/text/rating.
+    Raises on failure: st.cache_data doesn't cache exceptions, so a transient error isn't pinned for a day."""
+    r = safe_get(url, max_bytes=SITE_MAX_BYTES)
+    if not r or r.status_code != 200:
+        raise RuntimeError(f"fetch failed ({r.status_code if r is not None else 'no response'})")
+    soup = make_soup(r.text, parse_only=SITE_STRAINER)
+    # single walk over the strained tree: title, meta description and text tags
+    page_title, description, og_description = None, None, None
+    chunks = []
+    text_len = 0
+    for el in soup.find_all(True):
+        if el.name == "title":
+            if page_title is None:
+                page_title = el.get_text(strip=True)
+        elif el.name == "meta":
+            if el.get("name") == "description" and description is None:
+                description = el.get("content")
+            elif el.get("property") == "og:description" and og_description is None:
+                og_description = el.get("content")
+        elif el.name in SITE_TEXT_TAGS:
+            # nested markup (<a>, <b>, <script>...) is visited too; only the text tags count
+            if not chunks and extract_rating_from_text(description or og_description) is not None:
+                # the description leads the text and already has the rating: skip the body walk
+                break
+            chunk = el.get_text(separator=" ", strip=True)
+            chunks.append(chunk)
+            text_len += len(chunk) + 1
+            # nothing downstream reads past MAX_TEXT_CHARS; head tags come first
+            if text_len >= MAX_TEXT_CHARS:
                 break
+    description = description or og_description
+    if description:
+        chunks.insert(0, description)
+    # only the first MAX_TEXT_CHARS are ever read; keep cached/session copies small
+    txt = " ".join(chunks)[:MAX_TEXT_CHARS]
+    # bs4 trees are reference cycles; break them now instead of waiting for gc
+    soup.decompose()
+    return {"title": page_title or "", "text": txt, "rating": extract_rating_from_text(txt)}
+
+def fetch_site_details(href, title, snippet, fetch=True):
+    entry = {"url": href, "title": title, "snippet": snippet, "domain": urlparse(href).netloc if href else "", "rating": None, "date": None, "full_text": ""}
+    if not fetch or not is_fetchable(href):
+        return entry
+    try:
+        page = fetch_page(href)
     except Exception as e:
         if debug_mode:
-            st.write(f"[get_top_results] error: {e}")
-    return results[:max_results]
+            st.write(f"[fetch_site_details] error for {href}: {e}")
+        return entry
+    txt = page["text"]
+    entry["title"] = entry["title"] or page["title"]
+    entry["full_text"] = txt.lower()
+    entry["snippet"] = entry["snippet"] or (txt.strip()[:300] + "...") if txt else entry["snippet"]
+    entry["rating"] = page["rating"]
+    return entry
 
 # ---------------------------
 # Google Places (Maps) details
 # ---------------------------
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_google_places_details(query):
     """Find place via findplacefromtext then return details (including reviews)"""
     if not API_KEY:
@@ -125,8 +311,8 @@ def get_google_places_details(query):
         return None, {"debug": "missing_api_key"}
     try:
         find_url = f"https://maps.googleapis.com/maps/api/place/findplacefromtext/json?input={quote_plus(query)}&inputtype=textquery&fields=place_id,name,formatted_address&key={API_KEY}"
-        r = requests.get(find_url, timeout=8)
-        d = r.json()
+        r = SESSION.get(find_url, timeout=8)
+        d = orjson.loads(r.content)
         if debug_mode:
             st.write("[get_google_places_details] findplace response keys:", list(d.keys()))
         candidates = d.get("candidates", [])
@@ -135,8 +321,8 @@ def get_google_places_details(query):
         place = candidates[0]
         place_id = place.get("place_id")
         details_url = f"https://maps.googleapis.com/maps/api/place/details/json?place_id={place_id}&fields=name,rating,user_ratings_total,reviews,url&key={API_KEY}"
-        r2 = requests.get(details_url, timeout=8)
-        details = r2.json().get("result", {})
+        r2 = SESSION.get(details_url, timeout=8)
+        details = orjson.loads(r2.content).get("result", {})
         debug_payload = {"debug": "success", "place_id": place_id, "place_name": place.get("name")}
         return details, debug_payload
     except Exception as e:
@@ -147,7 +333,7 @@ def get_google_places_details(query):
 # ---------------------------
 # Yelp JSON fetch (preferred) + HTML fallback (light)
 # ---------------------------
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_yelp_reviews_json(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
     """
     1) Use Google CSE to find a Yelp /biz/ link for the query.
@@ -189,12 +375,12 @@ def fetch_yelp_reviews_json(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
     feed_url = f"https://www.yelp.com/biz/{alias}/review_feed?start=0&sort_by=date_desc"
     debug["feed_url"] = feed_url
     headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; PresenceMonitor/1.0)",
+        **DEFAULT_HEADERS,
         "Accept": "application/json, text/javascript, */*; q=0.01",
         "Referer": biz_url
     }
     try:
-        r = requests.get(feed_url, headers=headers, timeout=10)
+        r = SESSION.get(feed_url, headers=headers, timeout=10)
         debug["feed_status"] = r.status_code
         if r.status_code != 200:
             debug["status"] = "feed_non_200"
@@ -206,8 +392,11 @@ def fetch_yelp_reviews_json(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
         try:
             data = r.json()
         except Exception:
-            # attempt to extract JSON object with "reviews" array from HTML
-            m = re.search(r"(\{.*\"reviews\":\s*\[.*\]\s*\})", r.text, re.S)
+            # attempt to extract JSON object with "reviews" array from HTML;
+            # the greedy blob regex is expensive, so only run it if the key is there at all
+            # r.text re-decodes the body on every access: decode it once
+            text = r.text
+            m = yelp_reviews_blob_regex.search(text) if '"reviews"' in text else None
             if m:
                 try:
                     data = json.loads(m.group(1))
@@ -255,7 +444,7 @@ def fetch_yelp_reviews_json(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
 # ---------------------------
 # Healthgrades (simple HTML-based)
 # ---------------------------
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_healthgrades_reviews(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
     out = []
     debug = {"status":"init","source_url":None,"parsed":0}
@@ -271,8 +460,8 @@ def fetch_healthgrades_reviews(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
         if not r:
             debug["status"] = "fetch_failed"
             return out, debug
-        soup = BeautifulSoup(r.text, "html.parser")
-        revs = soup.find_all("div", class_=re.compile("review|patient|comment"), limit=max_reviews)
+        soup = make_soup(r.text)
+        revs = soup.find_all("div", class_=healthgrades_review_class_regex, limit=max_reviews)
         parsed = 0
         for rb in revs:
             text = rb.get_text(separator=" ", strip=True)
@@ -291,7 +480,7 @@ def fetch_healthgrades_reviews(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
 # ---------------------------
 # Glassdoor (simple HTML-based)
 # ---------------------------
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_glassdoor_reviews(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
     out = []
     debug = {"status":"init","source_url":None,"parsed":0}
@@ -306,7 +495,7 @@ def fetch_glassdoor_reviews(query, max_reviews=MAX_REVIEWS_PER_SOURCE):
         if not r:
             debug["status"] = "fetch_failed"
             return out, debug
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = make_soup(r.text)
         revs = soup.find_all("p", limit=max_reviews)
         parsed = 0
         for rb in revs:
@@ -357,29 +546,22 @@ REVIEW_SOURCES["google_places"]["fn"] = lambda q: (fetch_google_places_reviews(q
 # ---------------------------
 # Presence scoring & radar helpers
 # ---------------------------
-def calculate_presence_score(num_websites, avg_rating, avg_sentiment, most_recent_date, company_prevalence=0.0):
-    # weights same as before
-    w = {"sites":0.35,"rating":0.30,"sent":0.15,"rec":0.10,"comp":0.10}
+def calculate_presence_score(num_websites, avg_rating, avg_sentiment, most_recent_dt, company_prevalence=0.0):
     sites_score = min(num_websites,50)/50*100
     rating_score = (avg_rating or 0)/5*100
     sent_score = ((avg_sentiment or 0)+1)/2*100
     rec_score = 0
-    if most_recent_date:
+    if most_recent_dt:
         try:
-            days = (datetime.utcnow() - dateparser.parse(most_recent_date)).days
-            rec_score = 100 if days<=7 else 80 if days<=30 else 50 if days<=90 else 30 if days<=365 else 10
+            days = (datetime.utcnow() - most_recent_dt).days
+            rec_score = RECENCY_SCORES[bisect_left(RECENCY_LIMITS_DAYS, days)]
         except:
             rec_score = 20
-    comp_score = company_prevalence*100
-    total = (w["sites"]*sites_score + w["rating"]*rating_score + w["sent"]*sent_score +
-             w["rec"]*rec_score + w["comp"]*comp_score)
+    comp_score = company_prevalence*100 if company_prevalence else 0.0
+    total = (W_SITES*sites_score + W_RATING*rating_score + W_SENT*sent_score +
+             W_REC*rec_score + W_COMP*comp_score)
     total = max(0, min(100, total))
-    # grade
-    if total >= 90: grade = "A"
-    elif total >= 80: grade = "B"
-    elif total >= 70: grade = "C"
-    elif total >= 60: grade = "D"
-    else: grade = "F"
+    grade = GRADES[bisect_right(GRADE_THRESHOLDS, total)]
     breakdown = {"Sites": round(sites_score,1), "Rating": round(rating_score,1),
                  "Sentiment": round(sent_score,1), "Recency": rec_score, "Company": round(comp_score,1)}
     return {"score": round(total,2), "grade": grade, "breakdown": breakdown}
@@ -414,38 +596,48 @@ canonical_query = query_raw.strip()
 if debug_mode:
     st.write("Canonical query:", canonical_query)
 
+# ---------------------------
+# Start review sources in the background
+# ---------------------------
+# Places + registry sources don't depend on the CSE site parse below: start them now so
+# the phases overlap. Workers get this run's script context so st.cache_data / debug
+# writes behave as in the main thread.
+ctx = get_script_run_ctx()
+source_pool = ThreadPoolExecutor(max_workers=len(REVIEW_SOURCES), initializer=add_script_run_ctx, initargs=(None, ctx))
+places_future = source_pool.submit(get_google_places_details, canonical_query) if API_KEY else None
+source_futures = {key: source_pool.submit(meta["fn"], canonical_query)
+                  for key, meta in REVIEW_SOURCES.items()
+                  if key != "google_places" and meta.get("enabled", True)}
+
 # ---------------------------
 # Run CSE (top results) to get sites/mentions
 # ---------------------------
-cse_results = get_top_results(canonical_query, max_results=MAX_RESULTS) if (API_KEY and CSE_ID) else []
-parsed_sites = []
-domains = set()
-for item in cse_results:
-    href = item.get("href")
-    title = item.get("title")
-    snippet = item.get("snippet")
-    entry = {"url": href, "title": title, "snippet": snippet, "domain": urlparse(href).netloc if href else "", "rating": None, "date": None, "full_text": ""}
-    # light fetch to extract rating/snippet if possible
-    try:
-        r = safe_get(href)
-        if r and r.status_code == 200:
-            soup = BeautifulSoup(r.text, "html.parser")
-            entry["title"] = entry["title"] or (soup.title.string.strip() if soup.title else "")
-            meta = soup.find("meta", {"name":"description"}) or soup.find("meta", {"property":"og:description"})
-            txt = ""
-            if meta and meta.get("content"):
-                txt += meta.get("content") + " "
-            for el in soup.find_all(["p","span","li","blockquote"]):
-                txt += el.get_text(separator=" ", strip=True) + " "
-            entry["full_text"] = txt.lower()
-            entry["snippet"] = entry["snippet"] or (txt.strip()[:300] + "...") if txt else entry["snippet"]
-            entry["rating"] = extract_rating_from_text(txt[:8000])
-    except Exception as e:
-        if debug_mode:
-            st.write(f"[site parse] error for {href}: {e}")
-    parsed_sites.append(entry)
-    if entry.get("domain"):
-        domains.add(entry["domain"])
+try:
+    cse_results = get_top_results(canonical_query, max_results=MAX_RESULTS) if (API_KEY and CSE_ID) else []
+    # same page often comes back under several URL variants; keep the best-ranked one
+    unique_results = {}
+    for item in cse_results:
+        if item.get("href"):
+            unique_results.setdefault(canonical_url(item["href"]), item)
+
+    # only the top MAX_FETCHES_PER_DOMAIN results per host are fetched (the rest keep
+    # their CSE title/snippet) so one site can't eat the pool or rate-limit us.
+    per_domain = Counter()
+    fetch_jobs = []
+    for item in unique_results.values():
+        domain = urlparse(item["href"]).netloc.lower().removeprefix("www.")
+        per_domain[domain] += 1
+        fetch_jobs.append((item, per_domain[domain] <= MAX_FETCHES_PER_DOMAIN))
+
+    # fetches are network-bound: overlap them on a thread pool
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS, initializer=add_script_run_ctx, initargs=(None, ctx)) as ex:
+        parsed_sites = list(ex.map(lambda job: fetch_site_details(job[0].get("href"), job[0].get("title"), job[0].get("snippet"), fetch=job[1]),
+                                   fetch_jobs))
+except BaseException:
+    # don't leave the background sources running if the site phase fails
+    source_pool.shutdown(wait=False, cancel_futures=True)
+    raise
+domains = {entry["domain"] for entry in parsed_sites if entry.get("domain")}
 
 num_websites = len(parsed_sites)
 unique_domains = len(domains)
@@ -457,7 +649,7 @@ all_reviews = []
 source_debug = {}
 
 # Google Places (special handling)
-places_details, places_debug = get_google_places_details(canonical_query) if API_KEY else (None, {"debug":"no_api_key"})
+places_details, places_debug = places_future.result() if places_future else (None, {"debug":"no_api_key"})
 if places_details:
     # convert to reviews list (top MAX_REVIEWS_PER_SOURCE)
     gp_reviews = []
@@ -481,8 +673,7 @@ for key, meta in REVIEW_SOURCES.items():
         source_debug[key] = {"status":"disabled"}
         continue
     try:
-        fn = meta["fn"]
-        reviews, dbg = fn(canonical_query)
+        reviews, dbg = source_futures[key].result()
         # ensure list shape
         reviews = reviews or []
         if isinstance(reviews, tuple) and len(reviews)==2:
@@ -494,30 +685,29 @@ for key, meta in REVIEW_SOURCES.items():
         source_debug[key] = {"status":"exception", "exception": str(e)}
         if debug_mode:
             st.write(f"[source loop] {key} exception: {e}")
+source_pool.shutdown()
 
 # ---------------------------
 # Aggregate stats
 # ---------------------------
 ratings = [r["rating"] for r in all_reviews if r.get("rating") is not None]
 avg_rating = round(sum(ratings)/len(ratings),2) if ratings else None
-sentiments = [sentiment_score((r.get("text") or "")[:400]) for r in all_reviews]
+sentiment_texts = [(r.get("text") or "")[:400] for r in all_reviews]
+# duplicate/empty texts are common across sources; score each distinct one once
+unique_sentiments = {t: sentiment_score(t) for t in set(sentiment_texts)}
+sentiments = [unique_sentiments[t] for t in sentiment_texts]
 avg_sentiment = round(sum(sentiments)/len(sentiments),3) if sentiments else 0.0
-dates = [r.get("time") for r in all_reviews if r.get("time")]
-most_recent = None
+review_dates = []
 # attempt to parse times to get a recency heuristic (best-effort)
-for d in dates:
+for r in all_reviews:
+    if not r.get("time"):
+        continue
     try:
-        # if relative_time_description (e.g., "2 months ago") skip; look for ISO-like
-        dt = None
-        try:
-            dt = dateparser.parse(d)
-        except:
-            continue
-        if dt:
-            if not most_recent or dt > most_recent:
-                most_recent = dt.isoformat()
+        # relative_time_description (e.g., "2 months ago") is rejected by parse_date
+        review_dates.append(parse_date(r["time"]))
     except:
         continue
+most_recent = max(review_dates, default=None)
 
 # company prevalence placeholder
 company_prevalence = 0.0
@@ -551,8 +741,10 @@ tab_quotes, tab_sources, tab_google, tab_yelp = st.tabs(["Quotes","Sources","Goo
 
 with tab_quotes:
     st.subheader("Extracted quotes & sentiment")
-    pos = [r for r in all_reviews if sentiment_score((r.get("text") or "")[:300]) >= 0.2]
-    neg = [r for r in all_reviews if sentiment_score((r.get("text") or "")[:300]) <= -0.2]
+    # score each quote once, then partition
+    quote_scores = [(r, sentiment_score((r.get("text") or "")[:300])) for r in all_reviews]
+    pos = [r for r, s in quote_scores if s >= 0.2]
+    neg = [r for r, s in quote_scores if s <= -0.2]
     if pos:
         st.markdown("**Positive**")
         for p in pos[:10]:
@@ -616,9 +808,9 @@ if debug_mode:
 # ---------------------------
 # CSV Download
 # ---------------------------
-try:
-    df = pd.DataFrame(all_reviews)
-    if not df.empty:
-        st.download_button("Download aggregated reviews (.csv)", data=df.to_csv(index=False), file_name="presence_reviews.csv", mime="text/csv")
-except Exception:
-    pass
+if all_reviews:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=["site", "rating", "text", "url", "author", "time"], extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(all_reviews)
+    st.download_button("Download aggregated reviews (.csv)", data=buf.getvalue(), file_name="presence_reviews.csv", mime="text/csv")